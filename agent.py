@@ -1,4 +1,8 @@
 # agent.py
+import uuid
+import asyncio
+import orjson
+from concurrent.futures import ThreadPoolExecutor
 from google.adk.agents import LlmAgent
 from google.adk.models.google_llm import Gemini
 from google.genai import types
@@ -26,6 +30,13 @@ You are a Sales Pipeline Agent. You must:
 - Keep outputs concise and structured in JSON when asked.
 """
 
+# Safe deterministic outreach used when validation and repair both fail
+_FALLBACK_TEMPLATE = (
+    "Hi {contact},\n\n"
+    "Checking in regarding {company}. We have some updates that might interest you.\n\n"
+    "Best,\nSales Team"
+)
+
 # expose the tools but wrap generate_outreach to pass model if desired
 def generate_outreach_wrapper(company_name: str, contact_name: str, tier: str) -> dict:
     # pass model for polish, but keep failure-safe fallback
@@ -43,7 +54,24 @@ root_agent = LlmAgent(
 from session_manager import InMemorySessionService
 
 # Single instance of session service
-session_service = InMemorySessionService()
+session_service = InMemorySessionService(log_path=config.SESSION_LOG_PATH or None)
+
+# Shared pool for independent, I/O-bound tool calls within a pipeline
+executor = ThreadPoolExecutor(max_workers=config.MAX_WORKERS)
+
+def _run_sync(async_fn, *args):
+    """
+    Runs async_fn(*args) to completion for the sync entry points.
+    Callers already inside an event loop (adk web, notebooks) cannot use
+    asyncio.run, so the coroutine gets its own loop on a private thread;
+    `executor` is not used since the pipeline itself submits work to it.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(async_fn(*args))
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        return pool.submit(lambda: asyncio.run(async_fn(*args))).result()
 
 def summarize_lead(research_data: dict) -> str:
     """Helper to summarize research data."""
@@ -75,106 +103,219 @@ def ResearchAgent(company_name: str, session_id: str) -> dict:
 
 def validate_email(email: str) -> bool:
     """Simple validation helper."""
-    if not email or len(email) < 10:
-        return False
-    if "@" not in email: # Very basic check
-        return False
-    return True
+    return bool(email) and len(email) >= 10 and "@" in email # Very basic check
 
-def OutreachAgent(company_name: str, contact_name: str, session_id: str) -> dict:
+async def _draft_outreach(company_name: str, contact_name: str, session_id: str) -> dict:
     """
-    Procedural agent for outreach.
-    Loads research -> Scoring -> Outreach -> Validation -> Explanation.
-    Saves results to session.
+    Loads research from the session, scores the lead and drafts the
+    template email. Shared by OutreachAgent and Coordinator_run_many.
     """
     # 1. Load research from session
     session = session_service.get_session(session_id)
-    if not session or "research" not in session["state"]:
+    if not session or "research" not in session.state:
         raise ValueError(f"No research data found for session {session_id}")
     
-    research_data = session["state"]["research"]
-    employee_count = research_data.get("employee_count_est", 0)
-    
-    # 2. Scoring
+    research_data = session.state["research"]
+    return await _score_and_draft(company_name, contact_name, research_data.get("employee_count_est", 0))
+
+async def _score_and_draft(company_name: str, contact_name: str, employee_count: int) -> dict:
+    """Scores the lead and drafts the template email for known research."""
+    # 2. Scoring + 3. Outreach Generation (Initial Attempt)
+    # The template draft does not depend on the tier, so both calls run
+    # concurrently and the outreach is assembled once scoring completes.
     intent_score = 5 
-    score_data = tools.score_lead(company_name, employee_count, intent_score)
-    
-    # 3. Outreach Generation (Initial Attempt)
-    outreach_data = tools.generate_outreach(company_name, contact_name, score_data["tier"], model_client=None)
-    email_content = outreach_data.get("email", "")
+    loop = asyncio.get_running_loop()
+    score_future = loop.run_in_executor(executor, tools.score_lead, company_name, employee_count, intent_score)
+    email_future = loop.run_in_executor(executor, tools.draft_outreach_email, company_name, contact_name)
+    score_data, email = await asyncio.gather(score_future, email_future)
+    outreach_data = {"email": email, "tier": score_data["tier"]}
     
-    # 4. Validation & Repair Loop
-    is_valid = validate_email(email_content)
-    
-    if not is_valid:
+    return {
+        "score": score_data,
+        "outreach": outreach_data,
+        "employee_count": employee_count,
+        "intent_score": intent_score
+    }
+
+async def _repair_if_invalid(company_name: str, contact_name: str, draft: dict) -> dict:
+    """Returns a model-polished repair for an invalid draft, else None."""
+    email_content = draft["outreach"].get("email", "")
+    if not validate_email(email_content):
         # Attempt Repair (Single Cycle)
         # Try using the model to fix it if available, or just re-generate
         # Since we want a "repair", let's try the model-polished version as the repair strategy
         # This aligns with "repair should try either a model-polished rewrite..."
-        outreach_data = tools.generate_outreach(company_name, contact_name, score_data["tier"], model_client=model)
-        email_content = outreach_data.get("email", "")
-        is_valid = validate_email(email_content)
-        
-        if not is_valid:
-            # Fallback to safe deterministic variant
-            email_content = (
-                f"Hi {contact_name},\n\n"
-                f"Checking in regarding {company_name}. We have some updates that might interest you.\n\n"
-                "Best,\nSales Team"
-            )
-            outreach_data["email"] = email_content
-            outreach_data["validation_status"] = "fallback"
-        else:
-            outreach_data["validation_status"] = "repaired"
+        return await tools.generate_outreach_async(company_name, contact_name, draft["score"]["tier"], model_client=model)
+    return None
+
+def _build_outreach_result(company_name: str, contact_name: str, draft: dict, repaired: dict = None) -> dict:
+    """
+    Applies the repair outcome (None when the draft was valid), falls back
+    if needed and adds the explanation.
+    """
+    score_data = draft["score"]
+
+    # 4. Validation & Repair Loop: settle the final email and status in one pass
+    if repaired is None:
+        email_content = draft["outreach"].get("email", "")
+        validation_status = "valid"
     else:
-        outreach_data["validation_status"] = "valid"
+        email_content = repaired.get("email", "")
+        validation_status = "repaired"
+        if not validate_email(email_content):
+            # Fallback to safe deterministic variant
+            email_content = _FALLBACK_TEMPLATE.format(contact=contact_name, company=company_name)
+            validation_status = "fallback"
 
-    # 5. Explanation
-    outreach_data["score_explanation"] = (
-        f"Score {score_data['score']} (Tier {score_data['tier']}) based on "
-        f"{employee_count} employees and intent {intent_score}."
-    )
-    
-    # 6. Save to session
-    result = {
+    # 5. Explanation, built once as the final state
+    return {
         "score": score_data,
-        "outreach": outreach_data
+        "outreach": {
+            "email": email_content,
+            "tier": score_data["tier"],
+            "validation_status": validation_status,
+            "score_explanation": (
+                f"Score {score_data['score']} (Tier {score_data['tier']}) based on "
+                f"{draft['employee_count']} employees and intent {draft['intent_score']}."
+            )
+        }
     }
+
+def _finalize_outreach(company_name: str, contact_name: str, session_id: str, draft: dict, repaired: dict = None) -> dict:
+    """Builds the final outreach result and saves it to session."""
+    result = _build_outreach_result(company_name, contact_name, draft, repaired)
+    # 6. Save to session
     session_service.update_session(session_id, result)
-    
     return result
 
-def Coordinator_run(company_name: str, contact_name: str) -> dict:
+async def OutreachAgent_async(company_name: str, contact_name: str, session_id: str) -> dict:
     """
-    Coordinator function.
-    Creates session -> ResearchAgent -> OutreachAgent.
-    Returns structured dict.
+    Procedural agent for outreach.
+    Loads research -> Scoring -> Outreach -> Validation -> Explanation.
+    Saves results to session.
+    """
+    draft = await _draft_outreach(company_name, contact_name, session_id)
+    repaired = await _repair_if_invalid(company_name, contact_name, draft)
+    return _finalize_outreach(company_name, contact_name, session_id, draft, repaired)
+
+def OutreachAgent(company_name: str, contact_name: str, session_id: str) -> dict:
+    """Sync shim around OutreachAgent_async."""
+    return _run_sync(OutreachAgent_async, company_name, contact_name, session_id)
+
+async def Coordinator_run_async(company_name: str, contact_name: str) -> dict:
+    """
+    Coordinator task graph.
+    Research feeds both scoring and the template draft, which are independent
+    of each other and so run side by side on the shared executor; repair
+    needs the draft, and the explanation needs the score. Research is passed
+    along in locals instead of re-reading the session, and the session is
+    written once at the end.
     """
-    # 1. Create Session
-    import uuid
     session_id = str(uuid.uuid4())
     session_service.create_session(session_id)
-    
-    # 2. Run ResearchAgent
-    research_results = ResearchAgent(company_name, session_id)
-    
-    # 3. Run OutreachAgent
-    outreach_results = OutreachAgent(company_name, contact_name, session_id)
-    
+
+    # research_company may block on the enrichment API, so it runs off the loop
+    loop = asyncio.get_running_loop()
+    research_results = await loop.run_in_executor(executor, tools.research_company, company_name)
+    research_results["lead_summary"] = summarize_lead(research_results)
+
+    draft = await _score_and_draft(company_name, contact_name, research_results.get("employee_count_est", 0))
+    repaired = await _repair_if_invalid(company_name, contact_name, draft)
+    outreach_results = _build_outreach_result(company_name, contact_name, draft, repaired)
+
+    session_service.update_session(session_id, {"research": research_results, **outreach_results})
     return {
         "session_id": session_id,
         "research_results": research_results,
         "outreach_results": outreach_results
     }
 
+def Coordinator_run(company_name: str, contact_name: str) -> dict:
+    """
+    Coordinator function.
+    Creates session -> research -> outreach, via Coordinator_run_async
+    (same results as ResearchAgent then OutreachAgent).
+    Returns structured dict.
+    """
+    return _run_sync(Coordinator_run_async, company_name, contact_name)
+
+def Coordinator_run_batch(cases: list) -> list:
+    """
+    Runs independent Coordinator pipelines concurrently.
+    Takes a list of (company_name, contact_name) pairs.
+    Returns the results in input order.
+    """
+    # Pipelines block on futures submitted to `executor`, so they are fanned
+    # out on a separate pool to avoid starving it.
+    with ThreadPoolExecutor(max_workers=config.MAX_WORKERS) as pool:
+        return list(pool.map(lambda case: Coordinator_run(*case), cases))
+
+def Coordinator_run_many(cases: list) -> list:
+    """
+    Coordinator for several leads at once.
+    Runs research and drafting per lead, then polishes every draft that
+    needs repair in batched model calls (see tools.generate_outreach_batch).
+    Takes a list of (company_name, contact_name) pairs.
+    Returns one Coordinator_run-shaped dict per case, in input order; a case
+    that fails is reported as {"error": message} without failing the others.
+    """
+    results = [None] * len(cases)
+
+    def fail(i, e):
+        utils.logger.warning("Coordinator case %d (%s) failed: %s", i, cases[i][0], e)
+        results[i] = {"error": str(e)}
+
+    runs = {}
+    for i, (company_name, contact_name) in enumerate(cases):
+        try:
+            session_id = str(uuid.uuid4())
+            session_service.create_session(session_id)
+            research_results = ResearchAgent(company_name, session_id)
+        except Exception as e:
+            fail(i, e)
+            continue
+        runs[i] = (company_name, contact_name, session_id, research_results)
+
+    async def draft_all():
+        return await asyncio.gather(*(_draft_outreach(*run[:3]) for run in runs.values()), return_exceptions=True)
+    for (i, run), draft in zip(list(runs.items()), _run_sync(draft_all)):
+        if isinstance(draft, Exception):
+            fail(i, draft)
+            del runs[i]
+        else:
+            runs[i] = run + (draft,)
+
+    # Collect every draft that fails validation for one batched repair
+    pending = [i for i, run in runs.items() if not validate_email(run[4]["outreach"].get("email", ""))]
+    repaired = tools.generate_outreach_batch(
+        [
+            {"company_name": runs[i][0], "contact_name": runs[i][1], "tier": runs[i][4]["score"]["tier"]}
+            for i in pending
+        ],
+        model_client=model
+    )
+    repairs = dict(zip(pending, repaired))
+
+    for i, (company_name, contact_name, session_id, research_results, draft) in runs.items():
+        try:
+            outreach_results = _finalize_outreach(company_name, contact_name, session_id, draft, repairs.get(i))
+        except Exception as e:
+            fail(i, e)
+            continue
+        results[i] = {
+            "session_id": session_id,
+            "research_results": research_results,
+            "outreach_results": outreach_results
+        }
+    return results
+
 if __name__ == "__main__":
-    import json
     print("Sales Pipeline Agent - Demo Run")
     print("-------------------------------")
     try:
         # Example run
         result = Coordinator_run("Acme Corp", "Alice")
-        print(json.dumps(result, indent=2))
+        print(orjson.dumps(result, option=orjson.OPT_INDENT_2).decode())
         print("\n[Success] Agent workflow completed.")
     except Exception as e:
         print(f"\n[Error] Agent workflow failed: {e}")
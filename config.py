@@ -8,7 +8,23 @@ GEMINI_API_KEY = os.environ.get("GOOGLE_API_KEY")  # required
 MODEL_NAME = os.environ.get("GEMINI_MODEL", "gemini-2.5-flash")
 ADK_PORT = int(os.environ.get("ADK_PORT", "8000"))
 LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO")
+# "text" or "json" (json needs the optional python-json-logger package)
+LOG_FORMAT = os.environ.get("LOG_FORMAT", "text").lower()
+
+# Worker threads for concurrent tool calls inside the procedural pipeline
+MAX_WORKERS = int(os.environ.get("AGENT_MAX_WORKERS", "4"))
+
+# Per-call timeout for the best-effort outreach polish (milliseconds)
+POLISH_TIMEOUT_MS = int(os.environ.get("POLISH_TIMEOUT_MS", "5000"))
+
+# Number of outreach emails polished per batched model call
+OUTREACH_BATCH_SIZE = int(os.environ.get("OUTREACH_BATCH_SIZE", "8"))
+
+# Append-only session log for crash-safe sessions (needs msgpack); empty = in-memory only
+SESSION_LOG_PATH = os.environ.get("SESSION_LOG_PATH", "")
 
 # Optional enrichment adapter feature toggles
 ENABLE_EXTERNAL_ENRICHMENT = os.environ.get("ENABLE_ENRICHMENT", "false").lower() == "true"
 ENRICHMENT_API_KEY = os.environ.get("ENRICHMENT_API_KEY", "")
+# Enrichment endpoint (GET ?company=<name>); empty keeps the placeholder adapter
+ENRICHMENT_API_URL = os.environ.get("ENRICHMENT_API_URL", "")
@@ -6,9 +6,9 @@ os.environ["GOOGLE_API_KEY"] = "dummy_key"
 os.environ["GEMINI_MODEL"] = "dummy_model"
 
 try:
-    from agent import Coordinator_run
+    from agent import Coordinator_run_many
 except ImportError:
-    print("Error: Could not import Coordinator_run from agent.py")
+    print("Error: Could not import Coordinator_run_many from agent.py")
     sys.exit(1)
 except RuntimeError as e:
     print(f"Error during import: {e}")
@@ -24,28 +24,34 @@ def run_evaluation():
     print(f"{'Company':<15} | {'Contact':<10} | {'Status':<10} | {'Validation':<10}")
     print("-" * 55)
 
-    for case in test_cases:
+    # Run every case through one batched pipeline so model polish is shared
+    try:
+        results = Coordinator_run_many([(case["company"], case["contact"]) for case in test_cases])
+    except Exception as e:
+        for case in test_cases:
+            print(f"{case['company']:<15} | {case['contact']:<10} | ERROR      | {str(e)}")
+        return
+
+    for case, result in zip(test_cases, results):
         company = case["company"]
         contact = case["contact"]
         
-        try:
-            result = Coordinator_run(company, contact)
-            
-            # Verify structure
-            has_session = "session_id" in result
-            has_research = "research_results" in result
-            has_outreach = "outreach_results" in result
-            
-            status = "PASS" if (has_session and has_research and has_outreach) else "FAIL"
-            
-            # Check validation
-            outreach = result.get("outreach_results", {}).get("outreach", {})
-            validation_status = outreach.get("validation_status", "unknown")
-            
-            print(f"{company:<15} | {contact:<10} | {status:<10} | {validation_status:<10}")
-            
-        except Exception as e:
-            print(f"{company:<15} | {contact:<10} | ERROR      | {str(e)}")
+        if "error" in result:
+            print(f"{company:<15} | {contact:<10} | ERROR      | {result['error']}")
+            continue
+        
+        # Verify structure
+        has_session = "session_id" in result
+        has_research = "research_results" in result
+        has_outreach = "outreach_results" in result
+        
+        status = "PASS" if (has_session and has_research and has_outreach) else "FAIL"
+        
+        # Check validation
+        outreach = result.get("outreach_results", {}).get("outreach", {})
+        validation_status = outreach.get("validation_status", "unknown")
+        
+        print(f"{company:<15} | {contact:<10} | {status:<10} | {validation_status:<10}")
 
 if __name__ == "__main__":
     run_evaluation()
@@ -1,4 +1,6 @@
 import time
+import asyncio
+import logging
 import functools
 from typing import Callable, Any
 from utils import logger
@@ -11,9 +13,33 @@ def measure_time(tool_name: str) -> Callable:
         tool_name: The name of the tool being measured.
     """
     def decorator(func: Callable) -> Callable:
+        def log(start_ns: int, success: bool) -> None:
+            # Skip all work below when INFO is disabled
+            if not logger.isEnabledFor(logging.INFO):
+                return
+            duration_ns = time.perf_counter_ns() - start_ns
+            status = "success" if success else "failure"
+            logger.info(
+                "[observability] Tool: %s | Status: %s | Duration: %.4fs", tool_name, status, duration_ns / 1e9
+            )
+
+        if asyncio.iscoroutinefunction(func):
+            # Coroutines are timed until they complete, not until they are created
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs) -> Any:
+                start_ns = time.perf_counter_ns()
+                success = False
+                try:
+                    result = await func(*args, **kwargs)
+                    success = True
+                    return result
+                finally:
+                    log(start_ns, success)
+            return async_wrapper
+
         @functools.wraps(func)
         def wrapper(*args, **kwargs) -> Any:
-            start_time = time.time()
+            start_ns = time.perf_counter_ns()
             success = False
             try:
                 result = func(*args, **kwargs)
@@ -24,10 +50,6 @@ def measure_time(tool_name: str) -> Callable:
                 # We'll log the failure in the finally block
                 raise e
             finally:
-                duration = time.time() - start_time
-                status = "success" if success else "failure"
-                logger.info(
-                    f"[observability] Tool: {tool_name} | Status: {status} | Duration: {duration:.4f}s"
-                )
+                log(start_ns, success)
         return wrapper
     return decorator
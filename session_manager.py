@@ -1,73 +1,233 @@
+import os
+import mmap
 import time
-from typing import Dict, Any, Optional, List
+import struct
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, Any, Optional, List, Tuple
 from utils import logger
 
+# Cross-process lock for the session log (POSIX only)
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+@dataclass(slots=True)
+class Session:
+    """
+    A single session record.
+    Slotted to keep per-session memory small and attribute access cheap.
+    """
+    session_id: str
+    created_at: float
+    updated_at: float
+    state: Dict[str, Any] = field(default_factory=dict)
+
+# Must be a power of two: shards are picked with a bit mask
+_NUM_SHARDS = 16
+
+# Session log record prefix: payload length, little-endian uint32
+_RECORD_LEN = struct.Struct("<I")
+_INITIAL_LOG_SIZE = 1 << 20
+
+class SessionLog:
+    """
+    Append-only, memory-mapped session log.
+    Each record is a length prefix followed by a msgpack'd
+    [session_id, created_at, updated_at, state]; a None state marks a delete.
+    Writes are copies into the mapped page cache (no syscall per write), so
+    they survive a process crash; the OS flushes them to disk.
+    A log belongs to one process at a time: it is flock'd while open where
+    fcntl is available (elsewhere, callers must not share the path).
+    """
+
+    def __init__(self, path: str):
+        import msgpack  # only needed when persistence is enabled
+        self._packb = msgpack.packb
+        self._unpackb = msgpack.unpackb
+        self._lock = threading.Lock()
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        if fcntl is not None:
+            try:
+                fcntl.flock(self._fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                os.close(self._fd)
+                raise RuntimeError(f"Session log {path} is in use by another process")
+        size = os.fstat(self._fd).st_size
+        if size < _INITIAL_LOG_SIZE:
+            os.ftruncate(self._fd, _INITIAL_LOG_SIZE)
+            size = _INITIAL_LOG_SIZE
+        self._map = mmap.mmap(self._fd, size)
+        self._tail = 0
+
+    def replay(self) -> Dict[str, Session]:
+        """
+        Rebuilds the latest state of every live session and positions the
+        tail after the last complete record.
+        """
+        sessions: Dict[str, Session] = {}
+        view = memoryview(self._map)
+        pos = 0
+        try:
+            while pos + _RECORD_LEN.size <= len(view):
+                (length,) = _RECORD_LEN.unpack_from(view, pos)
+                start = pos + _RECORD_LEN.size
+                # Zero (never written or torn) or overrunning prefix ends the log
+                if length == 0 or start + length > len(view):
+                    break
+                try:
+                    session_id, created_at, updated_at, state = self._unpackb(view[start:start + length])
+                except Exception as e:
+                    # A corrupt record ends the log like a torn one
+                    logger.warning("Session log record at offset %d is corrupt, ignoring the rest: %s", pos, e)
+                    break
+                if state is None:
+                    sessions.pop(session_id, None)
+                else:
+                    sessions[session_id] = Session(session_id, created_at, updated_at, state)
+                pos = start + length
+        finally:
+            view.release()
+        self._tail = pos
+        if any(self._map[pos:pos + _RECORD_LEN.size]):
+            # Clear the discarded tail so its bytes can never replay after new records
+            self._map[pos:] = bytes(len(self._map) - pos)
+        return sessions
+
+    def append(self, session_id: str, created_at: float, updated_at: float, state: Optional[Dict[str, Any]]) -> None:
+        payload = self._packb([session_id, created_at, updated_at, state])
+        with self._lock:
+            start = self._tail + _RECORD_LEN.size
+            end = start + len(payload)
+            if end > len(self._map):
+                self._grow(end)
+            # Payload first, prefix last: a torn write leaves a zero prefix
+            self._map[start:end] = payload
+            _RECORD_LEN.pack_into(self._map, self._tail, len(payload))
+            self._tail = end
+
+    def _grow(self, needed: int) -> None:
+        size = len(self._map)
+        while size < needed:
+            size *= 2
+        self._map.flush()
+        self._map.close()
+        os.ftruncate(self._fd, size)
+        self._map = mmap.mmap(self._fd, size)
+
+    def close(self) -> None:
+        with self._lock:
+            self._map.flush()
+            self._map.close()
+            os.close(self._fd)
+
 class InMemorySessionService:
     """
     A simple in-memory session management service.
-    Stores session state in a dictionary.
+    Stores session state in dictionaries sharded by session_id, each behind
+    its own lock, so concurrent pipelines only contend on the same shard.
+    With log_path set, every change is also appended to a SessionLog and
+    sessions are replayed from it on startup.
     """
 
-    def __init__(self):
-        self.sessions: Dict[str, Dict[str, Any]] = {}
+    def __init__(self, log_path: Optional[str] = None):
+        self._shards: List[Tuple[threading.Lock, Dict[str, Session]]] = [
+            (threading.Lock(), {}) for _ in range(_NUM_SHARDS)
+        ]
+        self._log: Optional[SessionLog] = None
+        if log_path:
+            self._log = SessionLog(log_path)
+            for session_id, session in self._log.replay().items():
+                self._shard(session_id)[1][session_id] = session
+            logger.info("Replayed %d sessions from %s", len(self.list_sessions()), log_path)
 
-    def create_session(self, session_id: str) -> Dict[str, Any]:
+    def _shard(self, session_id: str) -> Tuple[threading.Lock, Dict[str, Session]]:
+        return self._shards[hash(session_id) & (_NUM_SHARDS - 1)]
+
+    def create_session(self, session_id: str) -> Session:
         """
         Creates a new session with the given session_id.
         If the session already exists, it is overwritten (or could raise an error).
         Here we overwrite for simplicity, but logging a warning.
         """
-        if session_id in self.sessions:
-            logger.warning(f"Session {session_id} already exists. Overwriting.")
-
         now = time.time()
-        session_data = {
-            "session_id": session_id,
-            "created_at": now,
-            "updated_at": now,
-            "state": {}
-        }
-        self.sessions[session_id] = session_data
-        logger.info(f"Created session: {session_id}")
-        return session_data
-
-    def get_session(self, session_id: str) -> Optional[Dict[str, Any]]:
+        session = Session(session_id=session_id, created_at=now, updated_at=now)
+        lock, sessions = self._shard(session_id)
+        with lock:
+            existed = session_id in sessions
+            sessions[session_id] = session
+            if self._log:
+                self._log.append(session_id, now, now, session.state)
+
+        if existed:
+            logger.warning("Session %s already exists. Overwriting.", session_id)
+        logger.info("Created session: %s", session_id)
+        return session
+
+    def get_session(self, session_id: str) -> Optional[Session]:
         """
         Retrieves a session by ID. Returns None if not found.
         """
-        return self.sessions.get(session_id)
+        lock, sessions = self._shard(session_id)
+        with lock:
+            return sessions.get(session_id)
 
-    def update_session(self, session_id: str, new_state: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    def update_session(self, session_id: str, new_state: Dict[str, Any]) -> Optional[Session]:
         """
         Updates the state of an existing session.
-        Merges new_state into the existing state.
+        Merges new_state into the existing state. A session with no state
+        yet adopts new_state as-is, so callers should not reuse that dict.
         Updates 'updated_at'.
-        Returns the updated session data, or None if session not found.
+        Returns the updated session, or None if session not found.
         """
-        session = self.sessions.get(session_id)
+        lock, sessions = self._shard(session_id)
+        with lock:
+            session = sessions.get(session_id)
+            if session:
+                # Merge state (move it in when there is nothing to merge into)
+                if session.state:
+                    session.state.update(new_state)
+                else:
+                    session.state = new_state
+                session.updated_at = time.time()
+                if self._log:
+                    self._log.append(session_id, session.created_at, session.updated_at, session.state)
+
         if not session:
-            logger.warning(f"Attempted to update non-existent session: {session_id}")
+            logger.warning("Attempted to update non-existent session: %s", session_id)
             return None
-
-        # Merge state
-        session["state"].update(new_state)
-        session["updated_at"] = time.time()
-        
-        logger.info(f"Updated session: {session_id}")
+        logger.info("Updated session: %s", session_id)
         return session
 
     def delete_session(self, session_id: str) -> bool:
         """
         Deletes a session. Returns True if deleted, False if not found.
         """
-        if session_id in self.sessions:
-            del self.sessions[session_id]
-            logger.info(f"Deleted session: {session_id}")
-            return True
-        return False
+        lock, sessions = self._shard(session_id)
+        with lock:
+            deleted = sessions.pop(session_id, None) is not None
+            if deleted and self._log:
+                self._log.append(session_id, 0.0, time.time(), None)
+
+        if deleted:
+            logger.info("Deleted session: %s", session_id)
+        return deleted
 
-    def list_sessions(self) -> List[Dict[str, Any]]:
+    def list_sessions(self) -> List[Session]:
         """
         Returns a list of all active sessions.
         """
-        return list(self.sessions.values())
+        result: List[Session] = []
+        for lock, sessions in self._shards:
+            with lock:
+                result.extend(sessions.values())
+        return result
+
+    def close(self) -> None:
+        """
+        Flushes and closes the session log, if any.
+        """
+        if self._log:
+            self._log.close()
+            self._log = None
@@ -0,0 +1,28 @@
+# tests/conftest.py
+from types import SimpleNamespace
+
+import pytest
+
+def _fake_model(*replies):
+    """
+    Stands in for the ADK Gemini wrapper's google-genai client (sync
+    api_client.models and async api_client.aio.models). Each reply is a string
+    or a callable taking the generate_content kwargs; the last one repeats.
+    Calls are recorded on .calls.
+    """
+    calls = []
+    def generate_content(**kwargs):
+        calls.append(kwargs)
+        reply = replies[min(len(calls), len(replies)) - 1]
+        return SimpleNamespace(text=reply(kwargs) if callable(reply) else reply)
+    async def generate_content_async(**kwargs):
+        return generate_content(**kwargs)
+    api_client = SimpleNamespace(
+        models=SimpleNamespace(generate_content=generate_content),
+        aio=SimpleNamespace(models=SimpleNamespace(generate_content=generate_content_async)),
+    )
+    return SimpleNamespace(api_client=api_client, model="fake-model", calls=calls)
+
+@pytest.fixture
+def fake_model():
+    return _fake_model
@@ -0,0 +1,113 @@
+# tests/test_agent.py
+import os
+import uuid
+import asyncio
+import threading
+import orjson
+
+os.environ.setdefault("GOOGLE_API_KEY", "test-key")
+
+import agent
+
+POLISHED = "Hi Alice,\n\nA quick note for Acme Corp - reply @ your convenience.\n\nBest,\nSales Team"
+
+def test_outreach_agent_repairs_with_async_polish(monkeypatch, fake_model):
+    model = fake_model(POLISHED)
+    monkeypatch.setattr(agent, "model", model)
+    session_id = "outreach-test"
+    agent.session_service.create_session(session_id)
+    agent.ResearchAgent("Acme Corp", session_id)
+
+    out = agent.OutreachAgent("Acme Corp", "Alice", session_id)
+    assert len(model.calls) == 1
+    assert model.calls[0]["model"] == "fake-model"
+    assert out["outreach"]["email"] == POLISHED
+    assert out["outreach"]["validation_status"] == "repaired"
+    assert agent.session_service.get_session(session_id).state["outreach"] == out["outreach"]
+
+def test_coordinator_run_inside_running_loop(monkeypatch, fake_model):
+    monkeypatch.setattr(agent, "model", fake_model(POLISHED))
+
+    async def caller():
+        return agent.Coordinator_run("Acme Corp", "Alice")
+
+    out = asyncio.run(caller())
+    assert out["outreach_results"]["outreach"]["validation_status"] == "repaired"
+
+def polish_reply(kwargs):
+    # batched prompts number their emails [1]:, [2]:, ...
+    n = kwargs["contents"].count("]:\n")
+    return orjson.dumps([POLISHED] * n).decode() if "JSON list" in kwargs["contents"] else POLISHED
+
+def run_agents(company_name, contact_name):
+    session_id = str(uuid.uuid4())
+    agent.session_service.create_session(session_id)
+    research_results = agent.ResearchAgent(company_name, session_id)
+    outreach_results = agent.OutreachAgent(company_name, contact_name, session_id)
+    return {"session_id": session_id, "research_results": research_results, "outreach_results": outreach_results}
+
+def without_session_id(run):
+    return {k: v for k, v in run.items() if k != "session_id"}
+
+CASES = [("Acme Corp", "Alice"), ("Globex", "Bob"), ("Initech", "Carol")]
+
+def test_coordinators_match_research_then_outreach(monkeypatch, fake_model):
+    monkeypatch.setattr(agent, "model", fake_model(polish_reply))
+    expected = [run_agents(*case) for case in CASES]
+    runs = {
+        "run": [agent.Coordinator_run(*case) for case in CASES],
+        "batch": agent.Coordinator_run_batch(CASES),
+        "many": agent.Coordinator_run_many(CASES),
+    }
+    for name, results in runs.items():
+        assert [without_session_id(r) for r in results] == [without_session_id(e) for e in expected], name
+        for result, exp in zip(results, expected):
+            state = agent.session_service.get_session(result["session_id"]).state
+            assert state == agent.session_service.get_session(exp["session_id"]).state, name
+
+def test_coordinator_run_many_polishes_in_one_call(monkeypatch, fake_model):
+    model = fake_model(polish_reply)
+    monkeypatch.setattr(agent, "model", model)
+    results = agent.Coordinator_run_many(CASES)
+    assert len(model.calls) == 1
+    assert [r["outreach_results"]["outreach"]["validation_status"] for r in results] == ["repaired"] * 3
+
+def test_coordinator_run_resolves_services_per_call(monkeypatch, fake_model):
+    monkeypatch.setattr(agent, "model", fake_model(POLISHED))
+    agent.Coordinator_run("Acme Corp", "Alice")
+    sessions = agent.InMemorySessionService()
+    monkeypatch.setattr(agent, "session_service", sessions)
+    monkeypatch.setattr(agent.tools, "research_company", lambda name: {"company_name": name, "employee_count_est": 2000})
+    out = agent.Coordinator_run("Acme Corp", "Alice")
+    assert out["research_results"]["employee_count_est"] == 2000
+    assert sessions.get_session(out["session_id"]).state["research"] == out["research_results"]
+
+def test_coordinator_run_many_reports_failures_per_case(monkeypatch, fake_model):
+    monkeypatch.setattr(agent, "model", fake_model(polish_reply))
+    research_company = agent.tools.research_company
+    def flaky_research(name):
+        if name == "Globex":
+            raise RuntimeError("enrichment down")
+        return research_company(name)
+    monkeypatch.setattr(agent.tools, "research_company", flaky_research)
+
+    results = agent.Coordinator_run_many(CASES)
+    assert results[1] == {"error": "enrichment down"}
+    assert [r["research_results"]["company_name"] for r in (results[0], results[2])] == ["Acme Corp", "Initech"]
+
+def test_coordinator_run_async_researches_off_the_loop(monkeypatch, fake_model):
+    monkeypatch.setattr(agent, "model", fake_model(POLISHED))
+    research_company = agent.tools.research_company
+    threads = []
+    def recording_research(name):
+        threads.append(threading.get_ident())
+        return research_company(name)
+    monkeypatch.setattr(agent.tools, "research_company", recording_research)
+
+    async def caller():
+        out = await agent.Coordinator_run_async("Acme Corp", "Alice")
+        return out, threading.get_ident()
+
+    out, loop_thread = asyncio.run(caller())
+    assert out["research_results"]["company_name"] == "Acme Corp"
+    assert threads and threads[0] != loop_thread
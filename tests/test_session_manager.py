@@ -0,0 +1,59 @@
+# tests/test_session_manager.py
+import struct
+import pytest
+from session_manager import InMemorySessionService
+
+def test_session_lifecycle():
+    svc = InMemorySessionService()
+    svc.create_session("s1")
+    svc.update_session("s1", {"research": {"company_name": "Acme"}})
+    assert svc.get_session("s1").state["research"]["company_name"] == "Acme"
+    assert svc.update_session("missing", {}) is None
+    assert svc.delete_session("s1")
+    assert svc.get_session("s1") is None
+
+def test_session_log_replay(tmp_path):
+    pytest.importorskip("msgpack")
+    path = str(tmp_path / "sessions.log")
+    svc = InMemorySessionService(log_path=path)
+    svc.create_session("keep")
+    svc.update_session("keep", {"score": {"tier": "A"}})
+    svc.update_session("keep", {"outreach": {"email": "Hi"}})
+    svc.create_session("gone")
+    svc.delete_session("gone")
+    svc.close()
+
+    restored = InMemorySessionService(log_path=path)
+    assert [s.session_id for s in restored.list_sessions()] == ["keep"]
+    assert restored.get_session("keep").state == {"score": {"tier": "A"}, "outreach": {"email": "Hi"}}
+    restored.close()
+
+def test_session_log_corrupt_tail(tmp_path):
+    pytest.importorskip("msgpack")
+    path = str(tmp_path / "sessions.log")
+    svc = InMemorySessionService(log_path=path)
+    svc.create_session("keep")
+    tail = svc._log._tail
+    svc.close()
+    with open(path, "r+b") as f:
+        f.seek(tail)
+        f.write(struct.pack("<I", 4) + b"\xc1\xc1\xc1\xc1")  # 0xc1 is never valid msgpack
+
+    restored = InMemorySessionService(log_path=path)
+    assert [s.session_id for s in restored.list_sessions()] == ["keep"]
+    restored.create_session("new")
+    restored.close()
+
+    again = InMemorySessionService(log_path=path)
+    assert sorted(s.session_id for s in again.list_sessions()) == ["keep", "new"]
+    again.close()
+
+def test_session_log_single_owner(tmp_path):
+    pytest.importorskip("msgpack")
+    pytest.importorskip("fcntl")
+    path = str(tmp_path / "sessions.log")
+    svc = InMemorySessionService(log_path=path)
+    with pytest.raises(RuntimeError):
+        InMemorySessionService(log_path=path)
+    svc.close()
+    InMemorySessionService(log_path=path).close()
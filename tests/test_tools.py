@@ -1,4 +1,5 @@
 # tests/test_tools.py
+import pytest
 import tools
 
 def test_research_company():
@@ -15,3 +16,143 @@ def test_generate_outreach_no_model():
     r = tools.generate_outreach("Acme", "Alice", "B", model_client=None)
     assert "email" in r
     assert "Acme" in r["email"] or "Alice" in r["email"]
+
+def test_generate_outreach_batch_no_model():
+    items = [
+        {"company_name": "Acme", "contact_name": "Alice", "tier": "A"},
+        {"company_name": "Globex", "contact_name": "Bob", "tier": "C"},
+    ]
+    out = tools.generate_outreach_batch(items, model_client=None)
+    assert [r["tier"] for r in out] == ["A", "C"]
+    assert out[0]["email"] == tools.generate_outreach("Acme", "Alice", "A")["email"]
+    assert "Globex" in out[1]["email"]
+
+def test_generate_outreach_polishes_with_sync_client(fake_model):
+    model = fake_model("Hi Alice, a polished note for Acme. Call +1 555 123 4567.")
+    r = tools.generate_outreach("Acme", "Alice", "B", model_client=model)
+    assert len(model.calls) == 1
+    assert model.calls[0]["model"] == "fake-model"
+    assert r == {"email": "Hi Alice, a polished note for Acme. Call [REDACTED_PHONE].", "tier": "B"}
+
+BATCH_ITEMS = [
+    {"company_name": "Acme", "contact_name": "Alice", "tier": "A"},
+    {"company_name": "Globex", "contact_name": "Bob", "tier": "C"},
+]
+
+def test_generate_outreach_batch_parses_fenced_json(fake_model):
+    model = fake_model('```json\n["Hi Alice, mail bob@acme.io", "Hi Bob"]\n```')
+    out = tools.generate_outreach_batch(BATCH_ITEMS, model_client=model)
+    assert len(model.calls) == 1
+    assert model.calls[0]["model"] == "fake-model"
+    assert out == [
+        {"email": "Hi Alice, mail [REDACTED_EMAIL]", "tier": "A"},
+        {"email": "Hi Bob", "tier": "C"},
+    ]
+
+def test_generate_outreach_batch_retries_bad_replies(fake_model):
+    model = fake_model("not json", '["Hi Alice", "Hi Bob"]')
+    out = tools.generate_outreach_batch(BATCH_ITEMS, model_client=model)
+    assert len(model.calls) == 2
+    assert [r["email"] for r in out] == ["Hi Alice", "Hi Bob"]
+
+def test_generate_outreach_batch_length_mismatch_keeps_templates(fake_model):
+    model = fake_model('["only one"]')
+    out = tools.generate_outreach_batch(BATCH_ITEMS, model_client=model)
+    assert len(model.calls) == 2
+    assert out == tools.generate_outreach_batch(BATCH_ITEMS, model_client=None)
+
+def test_research_company_stable_per_company():
+    a = tools.research_company("Acme Corp")
+    b = tools.research_company("  acme corp ")
+    assert a["stage"] == b["stage"]
+    assert a["employee_count_est"] == b["employee_count_est"]
+    assert b["company_name"] == "acme corp"
+
+def test_research_company_enrichment_keeps_caller_spelling(monkeypatch):
+    monkeypatch.setattr(tools, "ENABLE_EXTERNAL_ENRICHMENT", True)
+    monkeypatch.setattr(tools, "ENRICHMENT_API_KEY", "test-key")
+    tools.clear_research_cache()
+    tools.research_company("acme corp")
+    r = tools.research_company("Acme Corp")
+    tools.clear_research_cache()
+    assert r["summary"].startswith("Acme Corp ")
+    assert r["website"] == "https://www.acmecorp.com"
+
+def test_enrichment_session_retries_http_and_https():
+    for url in ("http://enrichment.local/v1", "https://enrichment.example/v1"):
+        assert tools._HTTP.get_adapter(url) is tools._HTTP_ADAPTER
+
+def test_scrub_output_for_pii():
+    from utils import scrub_output_for_pii
+    out = scrub_output_for_pii("Mail bob@acme.io or call +1 555 123 4567.")
+    assert out == "Mail [REDACTED_EMAIL] or call [REDACTED_PHONE]."
+    # re.sub semantics: leftmost-longest, non-overlapping matches
+    assert scrub_output_for_pii("a@b.cc@d.ee") == "[REDACTED_EMAIL]@d.ee"
+    assert scrub_output_for_pii("x@a.bc.d@e.fg") == "[REDACTED_EMAIL][REDACTED_EMAIL]"
+    # \s also matches the ASCII separators \x1c-\x1f
+    assert scrub_output_for_pii("555\x1c123\x1c4567") == "[REDACTED_PHONE]"
+
+def test_scrub_output_for_pii_dense_input():
+    # PII-dense text: overlap handling must stay linear in the number of
+    # matches (a quadratic pass takes minutes here)
+    from utils import scrub_output_for_pii, _scrub_with_re
+    text = "Mail bob@acme.io or call +1 555 123 4567. " * 20000
+    assert scrub_output_for_pii(text) == _scrub_with_re(text)
+
+def test_score_leads_batch_matches_score_lead():
+    names = ["A", "B", "C", "D"]
+    counts = [25, 120, 1250, 10000]
+    intents = [1, 5, 0, 3]
+    out = tools.score_leads_batch(names, counts, intents)
+    assert out == [tools.score_lead(n, c, i) for n, c, i in zip(names, counts, intents)]
+
+    # counts past int64 take the Python path instead of overflowing
+    counts = [25, 2**63]
+    out = tools.score_leads_batch(names[:2], counts, intents[:2])
+    assert out == [tools.score_lead(n, c, i) for n, c, i in zip(names, counts, intents)]
+
+def test_retry_only_catches_listed_exceptions():
+    calls = []
+    def flaky():
+        calls.append(1)
+        if len(calls) < 2:
+            raise TimeoutError("slow")
+        return "ok"
+    assert tools.retry(flaky, attempts=3, delay=0) == "ok"
+    assert len(calls) == 2
+
+    def broken():
+        calls.append(1)
+        raise KeyError("bug")
+    calls.clear()
+    with pytest.raises(KeyError):
+        tools.retry(broken, attempts=3, delay=0)
+    assert len(calls) == 1
+
+def test_retry_model_errors_skips_permanent_client_errors():
+    import httpx
+    from google.genai import errors as genai_errors
+    calls = []
+    def failing(error):
+        def fn():
+            calls.append(error)
+            raise error
+        return fn
+
+    for transient in (
+        httpx.ConnectError("offline"),
+        httpx.ReadTimeout("slow"),
+        genai_errors.ServerError(503, {"error": {"message": "busy"}}),
+        genai_errors.ClientError(429, {"error": {"message": "slow down"}}),
+    ):
+        calls.clear()
+        with pytest.raises(type(transient)):
+            tools.retry(failing(transient), attempts=2, delay=0, exceptions=tools._MODEL_ERRORS,
+                        retry_if=tools._is_transient_model_error)
+        assert len(calls) == 2
+
+    calls.clear()
+    with pytest.raises(genai_errors.ClientError):
+        tools.retry(failing(genai_errors.ClientError(400, {"error": {"message": "bad request"}})), attempts=2,
+                    delay=0, exceptions=tools._MODEL_ERRORS, retry_if=tools._is_transient_model_error)
+    assert len(calls) == 1
@@ -1,67 +1,185 @@
 # tools.py
 import time
+import orjson
+import asyncio
 import random
-from typing import Dict, Any
+import functools
+import threading
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from typing import Dict, Any, List
 from utils import logger, safe_str, scrub_output_for_pii
-from config import ENABLE_EXTERNAL_ENRICHMENT, ENRICHMENT_API_KEY
+from config import ENABLE_EXTERNAL_ENRICHMENT, ENRICHMENT_API_KEY, ENRICHMENT_API_URL, OUTREACH_BATCH_SIZE, POLISH_TIMEOUT_MS
 from google.adk.models.google_llm import Gemini
 from google.genai import types
+from google.genai import errors as genai_errors
 from observability import measure_time
 
+# google-genai's async transport, when installed
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+# Model-call failures worth retrying: server errors, rate limits and the
+# genai client's transport errors and timeouts (httpx, or aiohttp for async
+# calls). Other ClientErrors (bad key, bad request) are permanent, see
+# _is_transient_model_error.
+_MODEL_ERRORS = (
+    genai_errors.ServerError,
+    genai_errors.ClientError,
+    httpx.TransportError,
+    httpx.TimeoutException,
+    TimeoutError,
+) + ((aiohttp.ClientError,) if aiohttp else ())
+
+def _is_transient_model_error(e: Exception) -> bool:
+    return not isinstance(e, genai_errors.ClientError) or e.code == 429
+
+def _backoff_waits(attempts: int, delay: float, backoff: float) -> tuple:
+    # one wait per attempt; None marks the last attempt (re-raise, no sleep)
+    return tuple(delay * backoff ** i for i in range(attempts - 1)) + (None,)
+
 # retry helper (simple)
-def retry(fn, attempts=3, delay=1, backoff=2):
-    last_exc = None
-    for i in range(attempts):
+def retry(fn, attempts=3, delay=1, backoff=2, exceptions=(requests.RequestException, TimeoutError), retry_if=None):
+    # retry_if, when given, can veto retrying a caught exception
+    start = time.monotonic()
+    for i, wait in enumerate(_backoff_waits(attempts, delay, backoff)):
         try:
             return fn()
-        except Exception as e:
-            last_exc = e
-            wait = delay * (backoff ** i)
-            logger.warning(f"Tool call failed (attempt {i+1}/{attempts}), retrying in {wait}s: {e}")
+        except exceptions as e:
+            if wait is None or (retry_if is not None and not retry_if(e)):
+                raise
+            logger.warning(
+                "Tool call failed (attempt %d/%d, %.2fs elapsed), retrying in %ss: %s",
+                i + 1, attempts, time.monotonic() - start, wait, e
+            )
             time.sleep(wait)
-    raise last_exc
+
+async def retry_async(fn, attempts=3, delay=1, backoff=2, exceptions=_MODEL_ERRORS, retry_if=_is_transient_model_error):
+    """Awaitable counterpart of retry(); fn returns a coroutine."""
+    start = time.monotonic()
+    for i, wait in enumerate(_backoff_waits(attempts, delay, backoff)):
+        try:
+            return await fn()
+        except exceptions as e:
+            if wait is None or (retry_if is not None and not retry_if(e)):
+                raise
+            logger.warning(
+                "Tool call failed (attempt %d/%d, %.2fs elapsed), retrying in %ss: %s",
+                i + 1, attempts, time.monotonic() - start, wait, e
+            )
+            await asyncio.sleep(wait)
+
+# Outreach template, parsed once at import; filled with str.format per call
+_OUTREACH_TEMPLATE = (
+    "Hi {contact},\n\n"
+    "I noticed {company} is growing rapidly. We help teams like yours accelerate sales operations by automating lead qualification and outreach.\n\n"
+    "If you're open to a 15-minute sync, I'd love to share how companies reduced SDR time by 30%.\n\n"
+    "Best,\nSales-ops team"
+)
+
+def draft_outreach_email(company_name: str, contact_name: str) -> str:
+    """Template email without polish; unlike generate_outreach it needs no tier."""
+    return _OUTREACH_TEMPLATE.format(contact=contact_name, company=company_name)
 
 # --- Research tool: deterministic mock + optional enrichment adapter
+_rng = threading.local()
+
+def _rand() -> random.Random:
+    # One generator per thread, so concurrent pipelines never share RNG state
+    r = getattr(_rng, "r", None)
+    if r is None:
+        r = _rng.r = random.Random()
+    return r
+
+def _mock_profile(company_key: str) -> Dict[str, Any]:
+    # seeded by the normalized name so repeat lookups agree (and stay cacheable)
+    rng = _rand()
+    rng.seed(company_key)
+    return {
+        "stage": rng.choice(["Seed", "Series A", "Series B", "Public"]),
+        "employee_count_est": rng.choice([25, 120, 500, 2000, 10000]),
+    }
+
+# Shared pooled HTTP session for the enrichment adapter: connections (and
+# their TLS handshakes) are reused across lookups, retries handled by urllib3
+_HTTP = requests.Session()
+_HTTP_ADAPTER = HTTPAdapter(
+    pool_connections=16,
+    pool_maxsize=32,
+    max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=[429, 500, 503, 504]),
+)
+# plain http too (e.g. a local enrichment server), so it gets the same retries
+_HTTP.mount("https://", _HTTP_ADAPTER)
+_HTTP.mount("http://", _HTTP_ADAPTER)
+
+@functools.lru_cache(maxsize=1024)
+def _enrich_company(company_key: str) -> Dict[str, Any]:
+    # Raises on failure, so failed lookups are never cached
+    logger.info("Calling external enrichment API (adapter)")
+    if not ENRICHMENT_API_URL:
+        # placeholder - set ENRICHMENT_API_URL to call a real provider
+        # (its summary is filled in by research_company, see there)
+        return {
+            "industry": "SaaS",
+            "funding": "Series C",
+            "website": f"https://www.{company_key.replace(' ', '')}.com",
+        }
+    response = _HTTP.get(
+        ENRICHMENT_API_URL,
+        params={"company": company_key},
+        headers={"Authorization": f"Bearer {ENRICHMENT_API_KEY}"},
+        timeout=10,
+    )
+    response.raise_for_status()
+    # return enriched data dict; third-party text is scrubbed once here, so
+    # cache hits reuse the clean copy
+    enriched = orjson.loads(response.content)
+    if isinstance(enriched.get("summary"), str):
+        enriched["summary"] = scrub_output_for_pii(enriched["summary"])
+    return enriched
+
+def clear_research_cache() -> None:
+    """Drops cached enrichment results (admin hook)."""
+    _enrich_company.cache_clear()
+
 @measure_time("research_company")
 def research_company(company_name: str) -> Dict[str, Any]:
     company_name = safe_str(company_name).strip()
-    logger.info(f"[tool] research_company called for '{company_name}'")
+    logger.info("[tool] research_company called for '%s'", company_name)
+    company_key = company_name.lower()
 
     # deterministic mock baseline (safe for testing / evaluation)
     baseline = {
         "company_name": company_name,
         "industry": "Technology / SaaS",
-        "stage": random.choice(["Seed", "Series A", "Series B", "Public"]),
-        "employee_count_est": random.choice([25, 120, 500, 2000, 10000]),
+        **_mock_profile(company_key),
         "summary": f"{company_name} is a company operating in the Technology vertical (deterministic mock)."
     }
 
     # Optional enrichment adapter: call a real enrichment API if enabled (you must provide key)
+    # Results are memoized per normalized name, so repeat companies skip the API call
     if ENABLE_EXTERNAL_ENRICHMENT and ENRICHMENT_API_KEY:
-        def call_enrichment():
-            # placeholder - user implements actual integration
-            logger.info("Calling external enrichment API (adapter)")
-            # return enriched data dict
-            return {
-                "industry": "SaaS",
-                "funding": "Series C",
-                "website": f"https://www.{company_name.lower().replace(' ', '')}.com",
-                "summary": f"{company_name} appears to be a SaaS company (from enrichment)."
-            }
         try:
-            enriched = retry(call_enrichment, attempts=2, delay=1)
-            baseline.update(enriched)
+            baseline.update(_enrich_company(company_key))
+            if not ENRICHMENT_API_URL:
+                # The key is only for caching: user-facing text keeps the
+                # caller's spelling, so it is formatted outside the cache
+                baseline["summary"] = f"{company_name} appears to be a SaaS company (from enrichment)."
         except Exception as e:
-            logger.warning(f"Enrichment adapter failed: {e}")
+            logger.warning("Enrichment adapter failed: %s", e)
 
-    # Scrub sensitive tokens before returning (safety)
-    baseline["summary"] = scrub_output_for_pii(baseline["summary"])
+    # No scrub needed here: the mock summary is a fixed template around the
+    # (already returned) company name, and enrichment output is scrubbed at fetch
     return baseline
 
 # --- Lead scoring tool
 @measure_time("score_lead")
 def score_lead(company_name: str, employee_count: int, intent_score: int) -> Dict[str, Any]:
-    logger.info(f"[tool] score_lead: {company_name}, employees={employee_count}, intent={intent_score}")
+    logger.info("[tool] score_lead: %s, employees=%s, intent=%s", company_name, employee_count, intent_score)
     # Strongly typed defensive checks
     try:
         employee_count = int(employee_count)
@@ -75,38 +193,183 @@ def score_lead(company_name: str, employee_count: int, intent_score: int) -> Dic
     tier = "A" if score >= 12 else ("B" if score >= 6 else "C")
     return {"company_name": company_name, "score": score, "tier": tier}
 
+# Optional accelerators: numpy + a Numba-compiled kernel for batch lead
+# scoring, imported on the first batch since numba is slow to import
+np = None
+
+def _score_kernel_py(employee_counts, intents):
+    # Same formula as score_lead. fastmath is left off on purpose: it allows
+    # reciprocal division, which could move a score across a rounding edge.
+    scores = np.empty(employee_counts.shape[0], dtype=np.float64)
+    for i in range(employee_counts.shape[0]):
+        scores[i] = (employee_counts[i] / 100.0) + (intents[i] * 3)
+    return scores
+
+@functools.lru_cache(maxsize=None)
+def _score_kernel():
+    """Returns the compiled batch scoring kernel, or None without numpy/numba."""
+    global np
+    try:
+        import numpy
+        from numba import njit
+    except ImportError:
+        return None
+    np = numpy
+    return njit(cache=True)(_score_kernel_py)
+
+# --- Batch lead scoring (e.g. a CRM export); matches score_lead per row
+@measure_time("score_leads_batch")
+def score_leads_batch(names: List[str], employee_counts: List[int], intent_scores: List[int]) -> List[Dict[str, Any]]:
+    logger.info("[tool] score_leads_batch: %d leads", len(names))
+    if not (len(names) == len(employee_counts) == len(intent_scores)):
+        raise ValueError("names, employee_counts and intent_scores must have the same length")
+    try:
+        employee_counts = [int(e) for e in employee_counts]
+        intent_scores = [int(i) for i in intent_scores]
+    except Exception:
+        raise ValueError("employee_count and intent_score must be integers")
+
+    score_kernel = _score_kernel()
+    if score_kernel is not None:
+        try:
+            count_arr = np.asarray(employee_counts, dtype=np.int64)
+            intent_arr = np.asarray(intent_scores, dtype=np.int64)
+        except OverflowError:
+            # beyond int64; the Python loop takes any int, like score_lead
+            score_kernel = None
+    if score_kernel is None:
+        scores = [round((e / 100.0) + (i * 3), 2) for e, i in zip(employee_counts, intent_scores)]
+        tiers = ["A" if score >= 12 else ("B" if score >= 6 else "C") for score in scores]
+    else:
+        score_arr = np.round(score_kernel(count_arr, intent_arr), 2)
+        tiers = np.where(score_arr >= 12, "A", np.where(score_arr >= 6, "B", "C")).tolist()
+        scores = score_arr.tolist()
+
+    return [
+        {"company_name": name, "score": score, "tier": tier}
+        for name, score, tier in zip(names, scores, tiers)
+    ]
+
+def _polish_prompt(template: str) -> str:
+    return (
+        "Polish the following outreach email for tone and clarity. "
+        "DO NOT add any company-specific factual claims (no funding, no tech stack). "
+        f"Email:\n\n{template}"
+    )
+
+def _polish_config(max_output_tokens: int) -> types.GenerateContentConfig:
+    # Polish is best-effort: a short timeout and a single HTTP attempt per
+    # call, rather than the agent-wide retry policy the client was built with.
+    # retry()/retry_async() add the one extra attempt on top.
+    return types.GenerateContentConfig(
+        max_output_tokens=max_output_tokens,
+        http_options=types.HttpOptions(
+            timeout=POLISH_TIMEOUT_MS,
+            retry_options=types.HttpRetryOptions(attempts=1),
+        ),
+    )
+
 # --- Outreach generation tool (uses Gemini model for naturalness but constraints responses)
 @measure_time("generate_outreach")
 def generate_outreach(company_name: str, contact_name: str, tier: str, model_client: Gemini=None) -> Dict[str, Any]:
-    logger.info(f"[tool] generate_outreach: {company_name}, contact={contact_name}, tier={tier}")
+    logger.info("[tool] generate_outreach: %s, contact=%s, tier=%s", company_name, contact_name, tier)
     # Minimal templated approach to avoid hallucination: template + optional polish from LLM
-    template = (
-        f"Hi {contact_name},\n\n"
-        f"I noticed {company_name} is growing rapidly. We help teams like yours accelerate sales operations by automating lead qualification and outreach.\n\n"
-        "If you're open to a 15-minute sync, I'd love to share how companies reduced SDR time by 30%.\n\n"
-        "Best,\nSales-ops team"
-    )
+    template = draft_outreach_email(company_name, contact_name)
 
     # If model_client provided, ask it to polish but with strict guardrails (no new facts)
     if model_client:
         def call_model():
             # WARNING: model polish must be instructed not to add facts
-            prompt = (
-                "Polish the following outreach email for tone and clarity. "
-                "DO NOT add any company-specific factual claims (no funding, no tech stack). "
-                f"Email:\n\n{template}"
+            # Sync google-genai client behind the ADK Gemini wrapper
+            response = model_client.api_client.models.generate_content(
+                model=model_client.model,
+                contents=_polish_prompt(template),
+                config=_polish_config(200),
             )
-            # Using the genai library client wrapper for demonstration – adapt to API used
-            # NOTE: the ADK Gemini wrapper usage must match your installed version; this is illustrative
-            response = model_client.generate(prompt=prompt, max_output_tokens=200)
-            # depending on client lib, extract text
-            polished = response.text if hasattr(response, "text") else str(response)
-            return polished
+            return safe_str(response.text)
         try:
-            polished = retry(call_model, attempts=2, delay=0.5)
+            polished = retry(call_model, attempts=2, delay=0.5, exceptions=_MODEL_ERRORS, retry_if=_is_transient_model_error)
             polished = scrub_output_for_pii(polished)
             return {"email": polished, "tier": tier}
         except Exception as e:
-            logger.warning(f"Model polish failed: {e}")
+            logger.warning("Model polish failed: %s", e)
 
     return {"email": template, "tier": tier}
+
+# --- Async outreach generation: awaits the polish so callers can overlap other work
+@measure_time("generate_outreach_async")
+async def generate_outreach_async(company_name: str, contact_name: str, tier: str, model_client: Gemini=None) -> Dict[str, Any]:
+    logger.info("[tool] generate_outreach_async: %s, contact=%s, tier=%s", company_name, contact_name, tier)
+    template = draft_outreach_email(company_name, contact_name)
+
+    if model_client:
+        async def call_model():
+            # Async google-genai client behind the ADK Gemini wrapper
+            response = await model_client.api_client.aio.models.generate_content(
+                model=model_client.model,
+                contents=_polish_prompt(template),
+                config=_polish_config(200),
+            )
+            return safe_str(response.text)
+        try:
+            polished = await retry_async(call_model, attempts=2, delay=0.5)
+            polished = scrub_output_for_pii(polished)
+            return {"email": polished, "tier": tier}
+        except Exception as e:
+            logger.warning("Model polish failed: %s", e)
+
+    return {"email": template, "tier": tier}
+
+# --- Batched outreach polish: one model call per OUTREACH_BATCH_SIZE emails
+@measure_time("generate_outreach_batch")
+def generate_outreach_batch(items: List[Dict[str, Any]], model_client: Gemini=None) -> List[Dict[str, Any]]:
+    """
+    Batched variant of generate_outreach.
+    Each item carries company_name, contact_name and tier; results keep input order.
+    Emails whose batch fails to polish keep their template text.
+    """
+    logger.info("[tool] generate_outreach_batch: %d emails, batch_size=%d", len(items), OUTREACH_BATCH_SIZE)
+    results = [
+        {"email": draft_outreach_email(item["company_name"], item["contact_name"]), "tier": item["tier"]}
+        for item in items
+    ]
+    if not model_client:
+        return results
+
+    for start in range(0, len(results), OUTREACH_BATCH_SIZE):
+        batch = results[start:start + OUTREACH_BATCH_SIZE]
+
+        def call_model(batch=batch):
+            # Same guardrails as generate_outreach, asking for a JSON list back
+            prompt = (
+                "Polish each outreach email below for tone and clarity. "
+                "Return a JSON list of strings, one per email, in the same order. "
+                "DO NOT add any company-specific factual claims (no funding, no tech stack).\n\n"
+                + "\n\n".join(f"[{n}]:\n{r['email']}" for n, r in enumerate(batch, 1))
+            )
+            # Sync google-genai client behind the ADK Gemini wrapper
+            response = model_client.api_client.models.generate_content(
+                model=model_client.model,
+                contents=prompt,
+                config=_polish_config(200 * len(batch)),
+            )
+            text = safe_str(response.text)
+            # models often wrap JSON in a markdown fence
+            text = text.strip().removeprefix("```json").removeprefix("```").removesuffix("```")
+            polished = orjson.loads(text)
+            if not isinstance(polished, list) or len(polished) != len(batch):
+                raise ValueError(f"expected a JSON list of {len(batch)} emails")
+            return polished
+        try:
+            # malformed JSON (ValueError) is worth another sample too
+            polished = retry(
+                call_model, attempts=2, delay=0.5,
+                exceptions=_MODEL_ERRORS + (ValueError,), retry_if=_is_transient_model_error,
+            )
+        except Exception as e:
+            logger.warning("Batched model polish failed: %s", e)
+            continue
+        for result, email in zip(batch, polished):
+            result["email"] = scrub_output_for_pii(safe_str(email))
+
+    return results
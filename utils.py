@@ -1,13 +1,59 @@
 # utils.py
 import logging
 import json
+import re
+import bisect
+import threading
 from typing import Any
 
+from config import LOG_LEVEL, LOG_FORMAT
+
+# Optional accelerator: one multi-pattern DFA scan for PII instead of two re passes
+try:
+    import hyperscan
+except ImportError:
+    hyperscan = None
+
+# Optional structured logging (LOG_FORMAT=json)
+try:
+    from pythonjsonlogger.json import JsonFormatter
+except ImportError:
+    JsonFormatter = None
+
 logger = logging.getLogger("sales_agent")
+# getLevelName maps a known name to its number, anything else to a string
+_log_level = logging.getLevelName(LOG_LEVEL.upper())
+logger.setLevel(_log_level if isinstance(_log_level, int) else logging.INFO)
 handler = logging.StreamHandler()
-formatter = logging.Formatter("%(asctime)s %(levelname)s %(message)s")
+if LOG_FORMAT == "json" and JsonFormatter is not None:
+    formatter = JsonFormatter("%(asctime)s %(levelname)s %(message)s")
+else:
+    formatter = logging.Formatter("%(asctime)s %(levelname)s %(message)s")
 handler.setFormatter(formatter)
 logger.addHandler(handler)
+if not isinstance(_log_level, int):
+    logger.warning("Invalid LOG_LEVEL %r, using INFO", LOG_LEVEL)
+
+# PII patterns used by scrub_output_for_pii, compiled once at import
+_EMAIL_RE = re.compile(r"\b[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}\b")
+_PHONE_RE = re.compile(r"\+?\d[\d\-\s]{7,}\d")
+
+_EMAIL_ID, _PHONE_ID = 1, 2
+_REDACTIONS = {_EMAIL_ID: b"[REDACTED_EMAIL]", _PHONE_ID: b"[REDACTED_PHONE]"}
+
+def _build_pii_db():
+    db = hyperscan.Database()
+    db.compile(
+        expressions=[_EMAIL_RE.pattern.encode(), _PHONE_RE.pattern.encode()],
+        ids=[_EMAIL_ID, _PHONE_ID],
+        elements=2,
+        flags=[hyperscan.HS_FLAG_SOM_LEFTMOST] * 2,
+    )
+    return db
+
+_PII_DB = _build_pii_db() if hyperscan else None
+# hyperscan scratch space must not be shared between concurrent scans
+_pii_scratch = threading.local()
 
 def safe_str(s: Any) -> str:
     if s is None:
@@ -16,12 +62,75 @@ def safe_str(s: Any) -> str:
 
 def require_env(varname: str, value: str):
     if not value:
-        logger.error(f"Missing required env var: {varname}")
+        logger.error("Missing required env var: %s", varname)
         raise RuntimeError(f"Missing required env var: {varname}")
 
+def _select_spans(spans: list) -> list:
+    """
+    Picks non-overlapping spans leftmost-longest, the way re.sub walks the
+    text. hyperscan only reports the leftmost start for each match end, so a
+    skipped span running past a picked one may hide a match re would find
+    after it; None tells the caller to fall back to re.
+    """
+    picked = []
+    for start, end in sorted(spans, key=lambda span: (span[0], -span[1])):
+        if picked and start < picked[-1][1]:
+            if end > picked[-1][1]:
+                return None
+            continue
+        picked.append((start, end))
+    return picked
+
+def _scrub_with_hyperscan(text: str) -> str:
+    data = text.encode("ascii")
+    found = {_EMAIL_ID: [], _PHONE_ID: []}
+
+    def on_match(pattern_id, start, end, flags, context):
+        found[pattern_id].append((start, end))
+
+    scratch = getattr(_pii_scratch, "scratch", None)
+    if scratch is None:
+        scratch = _pii_scratch.scratch = hyperscan.Scratch(_PII_DB)
+    _PII_DB.scan(data, match_event_handler=on_match, scratch=scratch)
+    if not found[_EMAIL_ID] and not found[_PHONE_ID]:
+        return text
+
+    # Emails are redacted first on the re path, so phones overlapping one are dropped
+    emails = _select_spans(found[_EMAIL_ID])
+    if emails is None:
+        return _scrub_with_re(text)
+    # emails are sorted and disjoint: the only one a phone can overlap is the
+    # first ending after the phone starts
+    email_starts = [start for start, _ in emails]
+    email_ends = [end for _, end in emails]
+    phones = _select_spans([
+        (start, end) for start, end in found[_PHONE_ID]
+        if (i := bisect.bisect_right(email_ends, start)) == len(emails) or email_starts[i] >= end
+    ])
+    if phones is None:
+        return _scrub_with_re(text)
+    spans = sorted([(s, e, _EMAIL_ID) for s, e in emails] + [(s, e, _PHONE_ID) for s, e in phones])
+
+    # Single pass rebuilding the text with redactions
+    parts, pos = [], 0
+    for start, end, pattern_id in spans:
+        parts.append(data[pos:start])
+        parts.append(_REDACTIONS[pattern_id])
+        pos = end
+    parts.append(data[pos:])
+    return b"".join(parts).decode("ascii")
+
+def _scrub_with_re(text: str) -> str:
+    return _PHONE_RE.sub("[REDACTED_PHONE]", _EMAIL_RE.sub("[REDACTED_EMAIL]", text))
+
+# ASCII separators Python's \s matches but hyperscan's does not
+_HS_UNSAFE_CHARS = "\x1c\x1d\x1e\x1f"
+
 def scrub_output_for_pii(text: str) -> str:
     # Minimal scrub: remove email-like tokens, phone-like tokens
-    import re
-    text = re.sub(r"\b[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}\b", "[REDACTED_EMAIL]", text)
-    text = re.sub(r"\+?\d[\d\-\s]{7,}\d", "[REDACTED_PHONE]", text)
-    return text
+    # The hyperscan database is byte/ASCII based; non-ASCII text and the
+    # separators above keep the Unicode-aware re path so both produce
+    # identical output.
+    if _PII_DB is not None and text.isascii() and not any(c in text for c in _HS_UNSAFE_CHARS):
+        return _scrub_with_hyperscan(text)
+    return _scrub_with_re(text)